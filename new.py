@@ -2,7 +2,14 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import altair as alt
-from scipy.optimize import minimize
+import numexpr as ne
+from concurrent.futures import ThreadPoolExecutor
+from numba import njit
+from scipy.optimize import differential_evolution, linprog, minimize
+
+# Run Vega-Lite data transforms server-side (compiled Rust) instead of in the
+# browser, shrinking the chart payload and the client-side work per render
+alt.data_transformers.enable("vegafusion")
 
 # ---------------------------------------------------------------------------------
 # PAGE SETUP & STYLES
@@ -13,13 +20,6 @@ st.set_page_config(page_title="Free LCOH Model", layout="wide")
 st.markdown(
     """
     <style>
-    .param-header {
-        font-weight: 600;
-        background-color: #f0f2f6;
-        padding: 6px;
-        border-bottom: 2px solid #ccc;
-        text-align: center;
-    }
     .section-title {
         font-size: 1.1rem;
         font-weight: 600;
@@ -184,10 +184,232 @@ parameters = [
     },
 ]
 
+# Canonical parameter ordering, used to turn the values dict into a flat
+# (hashable) tuple for caching and a flat float array for the jitted core.
+# These (and the editor's source frame) are built once at import, not per rerun.
+PARAM_KEYS = tuple(p["key"] for p in parameters)
+PARAM_INDEX = {key: i for i, key in enumerate(PARAM_KEYS)}
+PARAMS_DF = pd.DataFrame(parameters)[
+    ["label", "default_value", "min_value", "max_value", "in_optimization"]
+]
+
 # Dictionaries to store the user’s numeric inputs and optimization info
 user_values = {}
 opt_flags = {}
 
+# ---------------------------------------------------------------------------------
+# MODEL
+# The model itself lives at module level so both tabs share one cached copy.
+# ---------------------------------------------------------------------------------
+def vals_to_tuple(vals_dict):
+    """Flatten a values dict into a tuple ordered by PARAM_KEYS (cache key)."""
+    return tuple(float(vals_dict[k]) for k in PARAM_KEYS)
+
+
+# Positions of _model_core results in its return tuple
+LCOH_IDX = 0
+NPV_IDX = 1
+
+
+@njit(cache=True, fastmath=True)
+def _model_core(p):
+    """
+    Jitted scalar model core. `p` is a float64 array of the 17 parameters
+    in PARAM_KEYS order; returns (lcoh, npv, revenue, cost, profit, roi,
+    capex_per_kg, opex_per_kg, elec_per_kg, carbon_tax_per_kg).
+    """
+    capex_yr = p[0]
+    opex_yr = p[1]
+    annual_prod = p[2]
+    eff1 = p[7]
+    eff2 = p[8]
+    elec_cost = p[9]
+    crf = p[10]
+    dcf_factor = p[11]
+    h2_price = p[12]
+    carbon_tax_ton = p[13]
+    tax_credit = p[14]
+    storage_cost = p[15]
+    transport_cost = p[16]
+
+    # Avoid division by zero: clamp once up front, no branch in the expression
+    annual_prod = max(annual_prod, 1e-9)
+
+    # COMPONENT [$/KgH2] — example logic (placeholder)
+    capex_per_kg = (capex_yr * crf) / annual_prod
+    opex_per_kg = opex_yr / annual_prod
+    # Suppose total efficiency is sum of both? Or average? You decide:
+    elec_per_kg = (eff1 + eff2) * (elec_cost / 1000.0)
+    carbon_tax_per_kg = carbon_tax_ton / 1000.0  # if $/ton => $/kg
+    # LCOH = sum minus tax credit
+    lcoh = capex_per_kg + opex_per_kg + elec_per_kg + carbon_tax_per_kg + storage_cost + transport_cost - tax_credit
+
+    # COMPONENT [$]
+    revenue = h2_price * annual_prod
+    total_cost = lcoh * annual_prod
+    profit = revenue - total_cost
+    # Simple placeholder for NPV
+    npv = profit * dcf_factor  # e.g. single-lump approach
+    roi = (profit / total_cost) * 100.0 if total_cost != 0 else 0.0
+
+    return (lcoh, npv, revenue, total_cost, profit, roi,
+            capex_per_kg, opex_per_kg, elec_per_kg, carbon_tax_per_kg)
+
+
+@st.cache_data(max_entries=4096)
+def calculate_model(vals_tuple):
+    """
+    Placeholder formulas for LCOH, NPV, etc.
+    Replace with your exact Excel logic.
+
+    Takes the parameter values as a tuple ordered by PARAM_KEYS so that
+    repeated evaluations at the same point (optimizer gradient steps,
+    Streamlit reruns) are served from st.cache_data instead of recomputed.
+    The arithmetic itself runs in the jitted _model_core.
+    """
+    p = np.array(vals_tuple, dtype=np.float64)
+    (lcoh, npv, revenue, total_cost, profit, roi,
+     capex_per_kg, opex_per_kg, elec_per_kg, carbon_tax_per_kg) = _model_core(p)
+
+    money_check = "Money" if lcoh < vals_tuple[PARAM_INDEX["h2_selling_price"]] else "No Money"
+    # Basic placeholder for payback
+    payback = 5.0 if profit > 0 else 0.0  # dummy example
+
+    return {
+        # [$/KgH2]
+        "capex_per_kg": capex_per_kg,
+        "opex_per_kg": opex_per_kg,
+        "elec_per_kg": elec_per_kg,
+        "carbon_tax_per_kg": carbon_tax_per_kg,
+        "lcoh": lcoh,
+        "money_check": money_check,
+        # [$]
+        "revenue": revenue,
+        "cost": total_cost,
+        "profit": profit,
+        "npv": npv,
+        "payback": payback,
+        "roi": roi
+    }
+
+
+# ---------------------------------------------------------------------------------
+# VECTORIZED MODEL
+# Array version of the model for parameter sweeps: one NumPy pass over all
+# samples instead of one Python call per sample.
+# ---------------------------------------------------------------------------------
+@njit(cache=True, fastmath=True, nogil=True)
+def _model_core_vec(P):
+    """
+    Vectorized model core. `P` is a (S, 17) float64 matrix of parameter sets,
+    one row per sample in PARAM_KEYS order; returns (lcoh, npv) arrays of
+    length S. Rows are evaluated serially with _model_core: call sites pass
+    at most ~100 rows of trivial arithmetic, and numba's parallel threading
+    layer must not be initialized from Streamlit's non-main ScriptRunner
+    threads (the tbb layer deadlocks the process at shutdown). This is
+    the optimizer's batch path (vec_objective, money_constraint_grad); the
+    sensitivity sweeps go through the numexpr expressions in
+    calculate_model_vec instead.
+    """
+    n = P.shape[0]
+    lcoh = np.empty(n, dtype=np.float64)
+    npv = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        out = _model_core(P[i])
+        lcoh[i] = out[0]
+        npv[i] = out[1]
+    return lcoh, npv
+
+
+
+def calculate_model_vec(vals_dict, sweep_key, sweep_array):
+    """
+    Evaluate the model with `sweep_key` replaced by `sweep_array` (np.ndarray)
+    and every other parameter fixed at its value in `vals_dict`.
+    Returns a dict of arrays (same shape as `sweep_array`) for LCOH and NPV.
+
+    Builds one contiguous (S, 17) parameter matrix — a single broadcast copy
+    of the base row plus one column overwrite — then evaluates the compound
+    LCOH/NPV expressions with numexpr, which fuses each into one array pass
+    (no operator-by-operator temporaries), vectorizes with SIMD and releases
+    the GIL like the jitted core, so the thread-pool sweeps still overlap.
+    """
+    base = np.fromiter((vals_dict[k] for k in PARAM_KEYS),
+                       dtype=np.float64, count=len(PARAM_KEYS))
+    P = np.broadcast_to(base, (sweep_array.shape[0], base.shape[0])).copy()
+    P[:, PARAM_INDEX[sweep_key]] = sweep_array
+
+    local_dict = {
+        "capex_yr": P[:, 0],
+        "opex_yr": P[:, 1],
+        "annual_prod": np.maximum(P[:, 2], 1e-9),
+        "eff1": P[:, 7],
+        "eff2": P[:, 8],
+        "elec_cost": P[:, 9],
+        "crf": P[:, 10],
+        "dcf_factor": P[:, 11],
+        "h2_price": P[:, 12],
+        "carbon_tax_ton": P[:, 13],
+        "tax_credit": P[:, 14],
+        "storage_cost": P[:, 15],
+        "transport_cost": P[:, 16],
+    }
+    lcoh = ne.evaluate(
+        "(capex_yr * crf + opex_yr) / annual_prod"
+        " + (eff1 + eff2) * elec_cost / 1000.0 + carbon_tax_ton / 1000.0"
+        " + storage_cost + transport_cost - tax_credit",
+        local_dict=local_dict
+    )
+    local_dict["lcoh"] = lcoh
+    npv = ne.evaluate("(h2_price - lcoh) * annual_prod * dcf_factor",
+                      local_dict=local_dict)
+    return {"lcoh": lcoh, "npv": npv}
+
+
+@st.cache_data
+def compute_decision_spec(opt_tuple, min_tuple, max_tuple, vals_tuple):
+    """
+    Derive the optimizer inputs from the parameter table: the decision-variable
+    keys, their starting values, their bounds and their slots in PARAM_KEYS
+    order. Cached on the table contents so reruns that don't edit the table
+    reuse the previous structures instead of re-traversing `parameters`.
+    """
+    decision_keys = [k for k, in_opt in zip(PARAM_KEYS, opt_tuple) if in_opt]
+    x0 = [vals_tuple[PARAM_INDEX[k]] for k in decision_keys]
+    bounds = [(min_tuple[PARAM_INDEX[k]], max_tuple[PARAM_INDEX[k]]) for k in decision_keys]
+    dv_idx = np.array([PARAM_INDEX[k] for k in decision_keys], dtype=np.intp)
+    return decision_keys, x0, bounds, dv_idx
+
+
+@st.cache_data
+def build_sensitivity_chart(input_hash, k, var_min, var_max, _npv_arr):
+    """
+    Build the NPV-vs-parameter chart for decision variable `k` from a sweep
+    of 20 samples between var_min and var_max, computed by the caller (see
+    the Tab 2 thread pool). Cached on the input-version hash plus the swept
+    range: the leading-underscore sweep array is excluded from the cache key,
+    so only widget changes that move st.session_state.input_hash invalidate
+    the charts.
+    """
+    steps = np.linspace(var_min, var_max, 20)
+    # One contiguous float64 block viewed by the DataFrame: no per-column
+    # dict handling or dtype inference. The buffer is per chart (not shared)
+    # because the cached chart object keeps a reference to its data.
+    buf = np.empty((steps.shape[0], 2), dtype=np.float64)
+    buf[:, 0] = steps
+    buf[:, 1] = _npv_arr
+    df_plot = pd.DataFrame(buf, columns=("ParamValue", "NPV"))
+    return (
+        alt.Chart(df_plot)
+        .mark_line(point=True)
+        .encode(
+            x=alt.X("ParamValue", title=f"{k}"),
+            y=alt.Y("NPV", title="NPV"),
+            tooltip=["ParamValue", "NPV"]
+        )
+        .properties(width=600, height=300, title=f"Sensitivity of NPV vs {k}")
+    )
+
 # ---------------------------------------------------------------------------------
 # TABBED LAYOUT
 # We'll create two tabs:
@@ -208,137 +430,45 @@ with tabs[0]:
     with left_col:
         st.subheader("Parameters")
 
-        # Build table header
-        hdr = st.columns([2.5, 1.2, 1, 1, 1.2])
-        with hdr[0]:
-            st.markdown("<div class='param-header'>Parameter</div>", unsafe_allow_html=True)
-        with hdr[1]:
-            st.markdown("<div class='param-header'>Green H2</div>", unsafe_allow_html=True)
-        with hdr[2]:
-            st.markdown("<div class='param-header'>min</div>", unsafe_allow_html=True)
-        with hdr[3]:
-            st.markdown("<div class='param-header'>max</div>", unsafe_allow_html=True)
-        with hdr[4]:
-            st.markdown("<div class='param-header'>In the optimization</div>", unsafe_allow_html=True)
-
-        # Create a row for each parameter
-        for param in parameters:
-            row_cols = st.columns([2.5, 1.2, 1, 1, 1.2])
-            with row_cols[0]:
-                st.write(param["label"])
-            with row_cols[1]:
-                val = st.number_input(
-                    label=" ",
-                    value=float(param["default_value"]),
-                    min_value=float(param["min_value"]),
-                    max_value=float(param["max_value"]),
-                    key=f"{param['key']}_val"
-                )
-            with row_cols[2]:
-                mn = st.number_input(
-                    label=" ",
-                    value=float(param["min_value"]),
-                    key=f"{param['key']}_min"
-                )
-            with row_cols[3]:
-                mx = st.number_input(
-                    label=" ",
-                    value=float(param["max_value"]),
-                    key=f"{param['key']}_max"
-                )
-            with row_cols[4]:
-                in_opt = st.checkbox(
-                    label=" ",
-                    value=param["in_optimization"],
-                    key=f"{param['key']}_opt"
-                )
-            
-            user_values[param["key"]] = val
-            opt_flags[param["key"]] = {
-                "min": mn,
-                "max": mx,
-                "in_opt": in_opt
+        # Single grid widget instead of 17 rows x 5 per-cell widgets: one
+        # serialized table per rerun rather than 85 widget round trips
+        edited = st.data_editor(
+            PARAMS_DF,
+            column_config={
+                "label": st.column_config.TextColumn("Parameter", disabled=True),
+                "default_value": st.column_config.NumberColumn("Green H2"),
+                "min_value": st.column_config.NumberColumn("min"),
+                "max_value": st.column_config.NumberColumn("max"),
+                "in_optimization": st.column_config.CheckboxColumn("In the optimization"),
+            },
+            num_rows="fixed",
+            hide_index=True,
+            use_container_width=True,
+            key="param_table"
+        )
+
+        for key, row in zip(PARAM_KEYS, edited.itertuples(index=False)):
+            user_values[key] = float(row.default_value)
+            opt_flags[key] = {
+                "min": float(row.min_value),
+                "max": float(row.max_value),
+                "in_opt": bool(row.in_optimization)
             }
 
+        # Version stamp for the model inputs: it only moves when a value that
+        # actually feeds calculate_model changes, so reruns caused by
+        # unrelated widgets (e.g. the enforce-money checkbox) leave the
+        # sensitivity caches untouched
+        st.session_state.input_hash = hash(vals_to_tuple(user_values))
+
     # -----------------------------------
     # RIGHT COLUMN: Components & Results
     # -----------------------------------
     with right_col:
         st.subheader("Components & Results")
 
-        def calculate_model(vals):
-            """
-            Placeholder formulas for LCOH, NPV, etc.
-            Replace with your exact Excel logic.
-            """
-            capex_yr = vals["capex_mw_yr"]
-            opex_yr = vals["opex_mw_yr"]
-            annual_prod = vals["annual_h2_prod"]
-            plant_life = vals["plant_life"]
-            discount_rate = vals["discount_rate"] / 100.0
-            cap_factor = vals["capacity_factor"] / 100.0
-            # Two separate H2 efficiencies from the screenshot
-            eff1 = vals["h2_efficiency_1"]
-            eff2 = vals["h2_efficiency_2"]
-            elec_cost = vals["electricity_cost"]
-            crf = vals["crf"]
-            dcf_factor = vals["dcf_factor"]
-            h2_price = vals["h2_selling_price"]
-            carbon_tax_ton = vals["carbon_tax"]
-            tax_credit = vals["tax_credit"]
-            storage_cost = vals["h2_storage_cost"]
-            transport_cost = vals["h2_transport_cost"]
-
-            # Avoid division by zero
-            if annual_prod <= 0:
-                annual_prod = 1e-9
-
-            # ------------------------
-            # COMPONENT [$/KgH2]
-            # Example logic (placeholder)
-            capex_per_kg = (capex_yr * crf) / annual_prod
-            opex_per_kg = opex_yr / annual_prod
-            # Suppose total efficiency is sum of both? Or average? You decide:
-            elec_per_kg = (eff1 + eff2) * (elec_cost / 1000.0)
-            carbon_tax_per_kg = carbon_tax_ton / 1000.0  # if $/ton => $/kg
-            # LCOH = sum minus tax credit
-            lcoh = capex_per_kg + opex_per_kg + elec_per_kg + carbon_tax_per_kg + storage_cost + transport_cost - tax_credit
-            money_check = "Money" if lcoh < h2_price else "No Money"
-
-            # ------------------------
-            # COMPONENT [$]
-            revenue = h2_price * annual_prod
-            total_cost = lcoh * annual_prod
-            profit = revenue - total_cost
-            # Simple placeholder for NPV
-            npv = profit * dcf_factor  # e.g. single-lump approach
-            # Basic placeholders for payback & ROI
-            payback = 0.0
-            roi = 0.0
-            if total_cost != 0:
-                roi = (profit / total_cost) * 100.0
-            if profit > 0:
-                payback = 5.0  # dummy example
-
-            return {
-                # [$/KgH2]
-                "capex_per_kg": capex_per_kg,
-                "opex_per_kg": opex_per_kg,
-                "elec_per_kg": elec_per_kg,
-                "carbon_tax_per_kg": carbon_tax_per_kg,
-                "lcoh": lcoh,
-                "money_check": money_check,
-                # [$]
-                "revenue": revenue,
-                "cost": total_cost,
-                "profit": profit,
-                "npv": npv,
-                "payback": payback,
-                "roi": roi
-            }
-
         # Calculate with current user inputs
-        results = calculate_model(user_values)
+        results = calculate_model(vals_to_tuple(user_values))
 
         st.markdown("<div class='section-title'>Component [$/KgH2]</div>", unsafe_allow_html=True)
         st.markdown(
@@ -377,56 +507,173 @@ with tabs[0]:
     st.subheader("Optimize NPV")
 
     # Minimizing negative NPV => maximizing NPV
-    def objective(x, fixed_params, dv_keys):
-        new_vals = fixed_params.copy()
-        for i, k in enumerate(dv_keys):
-            new_vals[k] = x[i]
-        out = calculate_model(new_vals)
-        return -out["npv"]
+    # Calls the jitted core directly: no dict result, no cache lookup.
+    # `base` is the fixed parameters as a float64 array in PARAM_KEYS order and
+    # `dv_idx` the slots of the decision variables, so overlaying x is a single
+    # contiguous copy plus a fancy-index write instead of a dict copy and loop.
+    def objective(x, base, dv_idx):
+        p = base.copy()
+        p[dv_idx] = x
+        return -_model_core(p)[NPV_IDX]
+
+    # Population form of the objective for differential_evolution: X has shape
+    # (n_dv, S), one column per candidate, evaluated in one broadcast pass
+    def vec_objective(X, base, dv_idx):
+        X = np.atleast_2d(X.T)
+        P = np.tile(base, (X.shape[0], 1))
+        P[:, dv_idx] = X
+        return -_model_core_vec(P)[1]
+
+    # Analytic gradient of the objective. NPV is closed-form:
+    #   npv = dcf * (h2_price*ap - capex*crf - opex - ap*q)
+    # with q = elec_per_kg + carbon_tax/1000 + storage + transport - tax_credit,
+    # so each partial is exact and scipy skips its (n+1)-call finite differences.
+    def objective_grad(x, base, dv_idx):
+        p = base.copy()
+        p[dv_idx] = x
+        ap = max(p[PARAM_INDEX["annual_h2_prod"]], 1e-9)
+        dcf = p[PARAM_INDEX["dcf_factor"]]
+        effs = p[PARAM_INDEX["h2_efficiency_1"]] + p[PARAM_INDEX["h2_efficiency_2"]]
+        q = (effs * p[PARAM_INDEX["electricity_cost"]] / 1000.0
+             + p[PARAM_INDEX["carbon_tax"]] / 1000.0
+             + p[PARAM_INDEX["h2_storage_cost"]]
+             + p[PARAM_INDEX["h2_transport_cost"]]
+             - p[PARAM_INDEX["tax_credit"]])
+
+        grad = np.zeros(len(dv_idx))
+        for i, j in enumerate(dv_idx):
+            k = PARAM_KEYS[j]
+            if k == "capex_mw_yr":
+                d = -dcf * p[PARAM_INDEX["crf"]]
+            elif k == "opex_mw_yr":
+                d = -dcf
+            elif k == "annual_h2_prod":
+                d = dcf * (p[PARAM_INDEX["h2_selling_price"]] - q)
+            elif k in ("h2_efficiency_1", "h2_efficiency_2"):
+                d = -dcf * ap * p[PARAM_INDEX["electricity_cost"]] / 1000.0
+            elif k == "electricity_cost":
+                d = -dcf * ap * effs / 1000.0
+            elif k == "crf":
+                d = -dcf * p[PARAM_INDEX["capex_mw_yr"]]
+            elif k == "dcf_factor":
+                d = (p[PARAM_INDEX["h2_selling_price"]] - q) * ap - p[PARAM_INDEX["capex_mw_yr"]] * p[PARAM_INDEX["crf"]] - p[PARAM_INDEX["opex_mw_yr"]]
+            elif k == "h2_selling_price":
+                d = dcf * ap
+            elif k == "carbon_tax":
+                d = -dcf * ap / 1000.0
+            elif k == "tax_credit":
+                d = dcf * ap
+            elif k in ("h2_storage_cost", "h2_transport_cost"):
+                d = -dcf * ap
+            else:
+                # capacity_factor, plant size/life, discount rate: not used by
+                # the placeholder NPV expression
+                d = 0.0
+            grad[i] = -d  # objective is -NPV
+        return grad
 
     # Optional constraint: LCOH < H2 Selling Price
     # If you have more constraints, define them similarly
     enforce_money = st.checkbox("Enforce LCOH < H2 Selling Price?", value=False)
 
-    def money_constraint(x, fixed_params, dv_keys):
-        new_vals = fixed_params.copy()
-        for i, k in enumerate(dv_keys):
-            new_vals[k] = x[i]
-        out = calculate_model(new_vals)
+    def money_constraint(x, base, dv_idx):
+        p = base.copy()
+        p[dv_idx] = x
         # LCOH < h2_selling_price => (h2_selling_price - LCOH) >= 0
-        return new_vals["h2_selling_price"] - out["lcoh"]
+        return p[PARAM_INDEX["h2_selling_price"]] - _model_core(p)[LCOH_IDX]
+
+    # Finite-difference gradient of the constraint, all n+1 perturbations in a
+    # single _model_core_vec call instead of n+1 serial evaluations by SLSQP.
+    # (The objective itself uses the exact objective_grad above.)
+    def money_constraint_grad(x, base, dv_idx, eps=1e-7):
+        n = len(x)
+        X = np.tile(x, (n + 1, 1))
+        X[1:] += eps * np.eye(n)
+        P = np.tile(base, (n + 1, 1))
+        P[:, dv_idx] = X
+        c = P[:, PARAM_INDEX["h2_selling_price"]] - _model_core_vec(P)[0]
+        return (c[1:] - c[0]) / eps
 
     # Build the list of decision variables
-    decision_keys = [p["key"] for p in parameters if opt_flags[p["key"]]["in_opt"]]
-    x0 = []
-    bounds = []
-    for k in decision_keys:
-        x0.append(user_values[k])
-        bounds.append((opt_flags[k]["min"], opt_flags[k]["max"]))
+    decision_keys, x0, bounds, dv_idx = compute_decision_spec(
+        tuple(opt_flags[k]["in_opt"] for k in PARAM_KEYS),
+        tuple(opt_flags[k]["min"] for k in PARAM_KEYS),
+        tuple(opt_flags[k]["max"] for k in PARAM_KEYS),
+        vals_to_tuple(user_values)
+    )
+
+    # Fixed parameters as a flat array: the objective/constraint overlay is
+    # then a 17-float memcpy per call
+    base_params = np.array(vals_to_tuple(user_values), dtype=np.float64)
 
     if st.button("Optimize NPV"):
         cons = []
         if enforce_money:
             cons.append({
                 'type': 'ineq',
-                'fun': lambda x: money_constraint(x, user_values, decision_keys)
+                'fun': lambda x: money_constraint(x, base_params, dv_idx),
+                'jac': lambda x: money_constraint_grad(x, base_params, dv_idx)
             })
 
-        res = minimize(
-            fun=objective,
-            x0=np.array(x0),
-            args=(user_values, decision_keys),
-            method="SLSQP",
-            bounds=bounds,
-            constraints=cons
-        )
+        if cons:
+            # SLSQP handles the inequality constraint
+            res = minimize(
+                fun=objective,
+                x0=np.array(x0),
+                args=(base_params, dv_idx),
+                method="SLSQP",
+                jac=objective_grad,
+                bounds=bounds,
+                constraints=cons
+            )
+        else:
+            # NPV is affine in each decision variable; the joint problem is
+            # only nonlinear when a multiplied pair is selected together
+            # (e.g. electricity cost x efficiency, selling price x annual
+            # production). Detect that by comparing the analytic gradient at
+            # the two bound corners: constant gradient => linear program.
+            x0_arr = np.array(x0)
+            lo = np.array([b[0] for b in bounds])
+            hi = np.array([b[1] for b in bounds])
+            c = objective_grad(x0_arr, base_params, dv_idx)
+            is_linear = (
+                np.allclose(c, objective_grad(lo, base_params, dv_idx))
+                and np.allclose(c, objective_grad(hi, base_params, dv_idx))
+            )
+
+            if is_linear:
+                # Exact one-shot solve of min c.x over the bounds with HiGHS;
+                # no iterations, no finite differences
+                res = linprog(c, bounds=bounds, method="highs")
+                if res.success:
+                    # Variables with zero coefficient (e.g. capacity factor,
+                    # which the placeholder NPV never uses) are left at their
+                    # current values instead of an arbitrary bound — clipped
+                    # into the declared bounds, which the user may have
+                    # edited past the current value
+                    res.x = np.where(c == 0.0, np.clip(x0_arr, lo, hi), res.x)
+            else:
+                # Bounds-only but nonlinear: global search, whole population
+                # per generation evaluated in one vectorized call, then a
+                # local polish at the end. (scipy's vectorized= and workers=
+                # are mutually exclusive, so the batching does the parallel
+                # work here.)
+                res = differential_evolution(
+                    func=vec_objective,
+                    bounds=bounds,
+                    args=(base_params, dv_idx),
+                    maxiter=100,
+                    polish=True,
+                    vectorized=True,
+                    updating="deferred"
+                )
 
         if res.success:
             st.success("Optimization successful!")
             final_params = user_values.copy()
             for i, k in enumerate(decision_keys):
                 final_params[k] = res.x[i]
-            final_res = calculate_model(final_params)
+            final_res = calculate_model(vals_to_tuple(final_params))
 
             st.write("**Optimized Decision Variables:**")
             for i, k in enumerate(decision_keys):
@@ -460,29 +707,26 @@ with tabs[1]:
         st.info("No variables are marked 'In the optimization.' Please select at least one in Tab 1.")
     else:
         # For each decision variable, we create a line chart: x=variable, y=NPV
-        for k in decision_keys:
-            # We'll sample from param's min to max in ~20 steps
-            var_min = opt_flags[k]["min"]
-            var_max = opt_flags[k]["max"]
-            steps = np.linspace(var_min, var_max, 20)
-
-            data_rows = []
-            for val in steps:
-                # Make a copy of user_values, override the single variable
-                temp_params = user_values.copy()
-                temp_params[k] = val
-                out = calculate_model(temp_params)
-                data_rows.append({"ParamValue": val, "NPV": out["npv"]})
-
-            df_plot = pd.DataFrame(data_rows)
-            chart = (
-                alt.Chart(df_plot)
-                .mark_line(point=True)
-                .encode(
-                    x=alt.X("ParamValue", title=f"{k}"),
-                    y=alt.Y("NPV", title="NPV"),
-                    tooltip=["ParamValue", "NPV"]
-                )
-                .properties(width=600, height=300, title=f"Sensitivity of NPV vs {k}")
+        # (sampled from the param's min to max in ~20 steps, cached per inputs).
+        # The sweeps are independent and release the GIL, so the pool workers
+        # run just the sweep math concurrently; the st.cache_data chart
+        # assembly and the rendering stay on the main thread, which has the
+        # ScriptRunContext the workers lack.
+        base_vals_tuple = vals_to_tuple(user_values)
+        base_vals_dict = dict(zip(PARAM_KEYS, base_vals_tuple))
+        # Read session state on the main thread: pool workers have no
+        # ScriptRunContext, so st.session_state is empty there
+        input_hash = st.session_state.input_hash
+        with ThreadPoolExecutor() as ex:
+            sweeps = list(ex.map(
+                lambda k: calculate_model_vec(
+                    base_vals_dict, k,
+                    np.linspace(opt_flags[k]["min"], opt_flags[k]["max"], 20)
+                )["npv"],
+                decision_keys
+            ))
+        for k, npv_arr in zip(decision_keys, sweeps):
+            chart = build_sensitivity_chart(
+                input_hash, k, opt_flags[k]["min"], opt_flags[k]["max"], npv_arr
             )
             st.altair_chart(chart, use_container_width=True)